@@ -6,6 +6,7 @@ import yaml
 from pydantic import BaseModel, Field, create_model
 from pydantic_ai import Agent, BinaryContent
 import logfire
+from .config.read_config import load_yaml
 from .tools.mcp import load_mcp_servers
 from .tools.search_web import search_web
 from .tools.visit_webpages import visit_webpages
@@ -93,7 +94,7 @@ class AugmentaAgent:
         yaml_file_path = Path(yaml_file_path)
         try:
             with open(yaml_file_path, 'r', encoding='utf-8') as f:
-                yaml_content = yaml.safe_load(f)
+                yaml_content = load_yaml(f)
                 
             if not isinstance(yaml_content, dict) or 'structure' not in yaml_content:
                 raise ValueError("YAML must contain a 'structure' dictionary")
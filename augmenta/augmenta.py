@@ -1,18 +1,22 @@
 """Core processing logic for the Augmenta package."""
 
-import json
 import asyncio
+import orjson
 import pandas as pd
 from pathlib import Path
 from typing import Optional, Tuple, Dict, Any, Callable, Type, Union, List
 from dataclasses import dataclass
 
-from augmenta.utils.prompt_formatter import format_examples, substitute_template_variables, build_complete_prompt
+from augmenta.utils.prompt_formatter import format_examples, substitute_template_variables, build_complete_prompt, get_template_variables
 from augmenta.agent import AugmentaAgent
 from augmenta.cache import CacheManager
 from augmenta.cache.process import setup_cache_handling, apply_cached_results
 from augmenta.config.read_config import load_config, get_config_values
 from augmenta.tools.file import load_file
+from augmenta.utils.csv_writer import OrderedCSVWriter
+from augmenta.utils.http_client import close_http_client
+from augmenta.utils.get_hash import get_hash
+from augmenta.utils.dataframe import assign_columns
 import logfire
 
 @dataclass
@@ -120,16 +124,27 @@ async def process_augmenta(
         df=df
     )
     
+    # Output rows are rebuilt from these input values plus each row's raw result
+    input_columns = list(df.columns)
+    
     if cache_enabled:
-        df = apply_cached_results(df, process_id, cache_manager)
+        df = apply_cached_results(df, process_id, cache_manager, cached_results)
     
-    # Prepare rows for processing with cache awareness
+    # Prepare rows for processing with cache awareness, keeping only the columns they use
+    row_columns = get_row_columns(df, config_data)
     rows_to_process = [
         {'index': index, 'data': row}
-        for index, row in df.iterrows()
+        for index, row in zip(df.index, df[row_columns].to_dict('records'))
         if not cache_enabled or index not in cached_results
     ]
     
+    # Stream rows to the output CSV as they complete, starting with cached ones
+    output_writer = open_output_writer(df, config_data)
+    if output_writer and cache_enabled:
+        for index in df.index:
+            if index in cached_results:
+                output_writer.add(index, build_output_row(df, index, input_columns, cached_results[index]))
+    
     # Setup progress tracking
     processed = 0
     total = len(rows_to_process)
@@ -141,34 +156,76 @@ async def process_augmenta(
         if progress_callback:
             progress_callback(processed, total, row_index)
     
+    # Examples are the same for every row, so format them once
+    examples_yaml = config_data.get("examples")
+    examples_text = format_examples(examples_yaml) if examples_yaml else ""
+    
+    # The response model only depends on the config, so build it once
+    response_format = AugmentaAgent.create_structure_class(config_data["config_path"])
+    
+    # Likewise the part of the LLM cache key shared by every row
+    llm_cache_scope = get_llm_cache_scope(agent, config_data) if cache_manager else None
+    
     # Process rows concurrently with rate limiting
     workers = config_data.get("workers", 10)
     semaphore = asyncio.Semaphore(workers)
     
-    async def process_with_limit(row: Dict[str, Any]) -> ProcessingResult:
-        """Process a row with rate limiting via semaphore.
+    async def process_with_limit(rows: List[Dict[str, Any]]) -> List[ProcessingResult]:
+        """Process a group of identical rows with rate limiting via semaphore.
+        
+        Only the first row is sent to the LLM; its result is shared with the rest.
         
         Args:
-            row: Row data to process
+            rows: Rows with identical prompt inputs
             
         Returns:
-            Processing result
+            Processing results, one per row
         """
         async with semaphore:
-            return await process_row(
-                row_data=row,
+            result = await process_row(
+                row_data=rows[0],
                 config=config_data,
                 agent=agent,
-                response_format=AugmentaAgent.create_structure_class(config_data["config_path"]),
+                response_format=response_format,
                 cache_manager=cache_manager,
                 process_id=process_id,
-                progress_callback=update_progress
+                progress_callback=update_progress,
+                examples_text=examples_text,
+                llm_cache_scope=llm_cache_scope
             )
+        
+        results = [result]
+        for duplicate in rows[1:]:
+            if result.data:
+                handle_result_tracking(
+                    cache_manager=cache_manager,
+                    process_id=process_id,
+                    index=duplicate['index'],
+                    response=result.data,
+                    progress_callback=update_progress
+                )
+            results.append(ProcessingResult(index=duplicate['index'], data=result.data, error=result.error))
+        
+        if output_writer:
+            for row_result in results:
+                try:
+                    output_writer.add(
+                        row_result.index,
+                        build_output_row(df, row_result.index, input_columns, row_result.data)
+                    )
+                except Exception as e:
+                    logfire.error(f"Failed to write row {row_result.index} to output CSV: {str(e)}")
+        return results
     
-    # Run all tasks under a single MCP server context
-    async with agent.get_mcp_servers_context():
-        tasks = [process_with_limit(row) for row in rows_to_process]
-        results = await asyncio.gather(*tasks)
+    try:
+        # Run all tasks under a single MCP server context
+        async with agent.get_mcp_servers_context():
+            tasks = [process_with_limit(rows) for rows in group_identical_rows(rows_to_process)]
+            results = [result for group in await asyncio.gather(*tasks) for result in group]
+    finally:
+        await close_http_client()
+        if output_writer:
+            output_writer.close()
 
     # Update DataFrame with results
     successful_results, error_count = update_dataframe_with_results(df, results)
@@ -178,7 +235,9 @@ async def process_augmenta(
         config_data=config_data,
         cache_enabled=cache_enabled,
         cache_manager=cache_manager,
-        process_id=process_id
+        process_id=process_id,
+        output_writer=output_writer,
+        error_count=error_count
     )
     
     return df, process_id if cache_enabled else None
@@ -192,6 +251,8 @@ async def process_row(
     cache_manager: Optional[CacheManager] = None,
     process_id: Optional[str] = None,
     progress_callback: Optional[Callable[[str], None]] = None,
+    examples_text: Optional[str] = None,
+    llm_cache_scope: Optional[str] = None,
 ) -> ProcessingResult:
     """Process a single data row asynchronously.
     
@@ -203,6 +264,8 @@ async def process_row(
         cache_manager: Optional cache manager for caching results
         process_id: Optional process ID for cache management
         progress_callback: Optional callback for progress updates
+        examples_text: Optional pre-formatted examples to append to the prompt
+        llm_cache_scope: Optional precomputed result of get_llm_cache_scope
         
     Returns:
         ProcessingResult containing processing result or error
@@ -210,7 +273,7 @@ async def process_row(
     try:
         index = row_data['index']
         row = row_data['data']        # Build complete prompt with data from row
-        prompt_user = build_complete_prompt(config, row)
+        prompt_user = build_complete_prompt(config, row, examples_text)
           # Get the file column name from config (if available)
         file_col = config.get("file_col")
         
@@ -225,18 +288,19 @@ async def process_row(
             logfire.debug("No file column specified in config")
             
         try:
-            binary_content = load_file(file_path) if file_path is not None else None
+            # Read the file off the event loop so other rows' LLM calls keep running
+            binary_content = await asyncio.to_thread(load_file, file_path) if file_path is not None else None
             if binary_content:
                 # If file exists, create a message list with prompt and binary content
                 message_contents = [prompt_user, binary_content]
                 response = await agent.run(message_contents, response_format=response_format)
             else:
                 # If file doesn't exist or couldn't be loaded, just use the text prompt
-                response = await agent.run(prompt_user, response_format=response_format)
+                response = await run_with_llm_cache(agent, prompt_user, response_format, config, cache_manager, llm_cache_scope)
         except Exception as e:
             logfire.warning(f"Error loading file at row {index}: {str(e)}. Proceeding with text prompt only.")
             # Fallback to text-only prompt if file handling fails
-            response = await agent.run(prompt_user, response_format=response_format)
+            response = await run_with_llm_cache(agent, prompt_user, response_format, config, cache_manager, llm_cache_scope)
         
         # Handle caching and progress tracking
         handle_result_tracking(
@@ -255,6 +319,64 @@ async def process_row(
 
 
 
+def get_llm_cache_scope(agent: AugmentaAgent, config: Dict[str, Any]) -> str:
+    """Hash everything besides the prompt that decides an LLM response.
+    
+    Args:
+        agent: Agent instance to use for processing
+        config: Configuration dictionary
+        
+    Returns:
+        Hash of the model settings, system prompt, response structure and the
+        tools the agent can call
+    """
+    return get_hash({
+        "model": agent.model,
+        "temperature": agent.temperature,
+        "max_tokens": agent.max_tokens,
+        "system": agent.system_prompt,
+        "structure": config.get("structure"),
+        "search": config.get("search"),
+        "mcp_servers": config.get("mcpServers"),
+    })
+
+
+async def run_with_llm_cache(
+    agent: AugmentaAgent,
+    prompt: str,
+    response_format: Type,
+    config: Dict[str, Any],
+    cache_manager: Optional[CacheManager] = None,
+    scope: Optional[str] = None
+) -> Dict[str, Any]:
+    """Run a text prompt, reusing the response from an earlier run if one is cached.
+    
+    Args:
+        agent: Agent instance to use for processing
+        prompt: Complete user prompt
+        response_format: Response format specification
+        config: Configuration dictionary
+        cache_manager: Optional cache manager; responses are only cached when given
+        scope: Optional precomputed result of get_llm_cache_scope
+        
+    Returns:
+        Response data from the cache or the agent
+    """
+    if cache_manager is None:
+        return await agent.run(prompt, response_format=response_format)
+    
+    if scope is None:
+        scope = get_llm_cache_scope(agent, config)
+    prompt_hash = get_hash({"scope": scope, "prompt": prompt})
+    cached = await asyncio.to_thread(cache_manager.get_llm_response, prompt_hash)
+    if cached is not None:
+        return cached
+    
+    response = await agent.run(prompt, response_format=response_format)
+    cache_manager.cache_llm_response(prompt_hash, agent.model, orjson.dumps(response).decode())
+    return response
+
+
 def handle_result_tracking(
     cache_manager: Optional[CacheManager],
     process_id: Optional[str],
@@ -277,7 +399,7 @@ def handle_result_tracking(
             process_id=process_id,
             row_index=index,
             query=str(index),  # Use row index as query identifier
-            result=json.dumps(response)
+            result=orjson.dumps(response).decode()
         )
     
     # Update progress if callback provided
@@ -298,17 +420,17 @@ def update_dataframe_with_results(
     Returns:
         Tuple of (successful_count, error_count)
     """
-    successful_results = 0
-    error_count = 0
-    
-    for result in results:
-        if result.data:
-            for key, value in result.data.items():
-                df.at[result.index, key] = value
-            successful_results += 1
-        elif result.error:
-            error_count += 1
-            df.at[result.index, "_error"] = result.error
+    updates = {result.index: result.data for result in results if result.data}
+    errors = {
+        result.index: {"_error": result.error}
+        for result in results
+        if not result.data and result.error
+    }
+    successful_results = len(updates)
+    error_count = len(errors)
+    
+    assign_columns(df, updates)
+    assign_columns(df, errors)
     
     # Log error summary
     if error_count > 0 and error_count == len(results):
@@ -319,12 +441,104 @@ def update_dataframe_with_results(
     return successful_results, error_count
 
 
+def group_identical_rows(rows: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    """Group rows whose prompt inputs are identical, so each group needs one LLM call.
+    
+    Args:
+        rows: Rows to process, each with 'index' and 'data' keys
+        
+    Returns:
+        Groups of rows, in order of each group's first row
+    """
+    groups: Dict[Tuple[Tuple[str, str], ...], List[Dict[str, Any]]] = {}
+    for row in rows:
+        key = tuple((str(column), str(value)) for column, value in row['data'].items())
+        groups.setdefault(key, []).append(row)
+    return list(groups.values())
+
+
+def get_row_columns(df: pd.DataFrame, config_data: Dict[str, Any]) -> List[str]:
+    """Get the input columns that row processing actually reads.
+    
+    Args:
+        df: Input DataFrame
+        config_data: Configuration dictionary
+        
+    Returns:
+        Columns referenced by the user prompt template or the file column
+    """
+    used = get_template_variables(config_data["prompt"]["user"])
+    if file_col := config_data.get("file_col"):
+        used.add(str(file_col))
+    return [column for column in df.columns if str(column) in used]
+
+
+def open_output_writer(df: pd.DataFrame, config_data: Dict[str, Any]) -> Optional[OrderedCSVWriter]:
+    """Open a streaming writer for the output CSV, if one is configured.
+    
+    Args:
+        df: Input DataFrame, which fixes the row order and leading columns
+        config_data: Configuration dictionary
+        
+    Returns:
+        Writer for the output CSV, or None if no output is configured or it can't be opened
+    """
+    output_csv = config_data.get("output_csv")
+    if not output_csv:
+        return None
+    
+    # Overwriting the input mid-run would lose it on a crash, so only write it once at the end
+    input_csv = config_data.get("input_csv")
+    if input_csv and Path(output_csv).resolve() == Path(input_csv).resolve():
+        logfire.warning("output_csv is the same file as input_csv; output will be written once all rows finish")
+        return None
+    
+    fieldnames = list(df.columns)
+    for column in config_data.get("structure", {}):
+        if column not in fieldnames:
+            fieldnames.append(column)
+    
+    try:
+        return OrderedCSVWriter(output_csv, df.index, fieldnames)
+    except Exception as e:
+        logfire.error(f"Failed to open output CSV: {str(e)}")
+        return None
+
+
+def build_output_row(
+    df: pd.DataFrame,
+    index: int,
+    input_columns: List[str],
+    result: Optional[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """Build one output CSV row from a row's input values and its result.
+    
+    Resumed and freshly processed rows both take their output values from the
+    raw result, so a column is rendered the same way whichever path a row took.
+    
+    Args:
+        df: DataFrame holding the input values
+        index: Row index
+        input_columns: Columns read from the input CSV
+        result: Result data for the row, or None if it failed
+        
+    Returns:
+        Column values for the row
+    """
+    row = {column: df.at[index, column] for column in input_columns}
+    if result:
+        row.update(result)
+    return row
+
+
 def save_and_finalize(
     df: pd.DataFrame,
     config_data: Dict[str, Any],
     cache_enabled: bool,
     cache_manager: Optional[CacheManager] = None,
-    process_id: Optional[str] = None
+    process_id: Optional[str] = None,
+    output_writer: Optional[OrderedCSVWriter] = None,
+    error_count: int = 0
 ) -> None:
     """Save output and finalize processing.
     
@@ -334,9 +548,13 @@ def save_and_finalize(
         cache_enabled: Whether caching is enabled
         cache_manager: Optional cache manager
         process_id: Optional process ID
+        output_writer: Writer that has already streamed the output CSV, if any
+        error_count: Number of failed rows; the streamed CSV has no _error column, so it is rewritten
     """
-    # Save CSV output if configured
-    if output_csv := config_data.get("output_csv"):
+    # Save CSV output if configured and not already streamed
+    if output_writer and output_writer.complete and not error_count:
+        logfire.info(f"Saved output to {config_data['output_csv']}")
+    elif output_csv := config_data.get("output_csv"):
         try:
             df.to_csv(output_csv, index=False)
             logfire.info(f"Saved output to {output_csv}")
@@ -1,8 +1,9 @@
 """Database operations for the cache system."""
 
 import sqlite3
+import threading
 from contextlib import contextmanager
-from typing import Generator, Any
+from typing import Generator, Optional, Set
 from pathlib import Path
 from datetime import datetime
 
@@ -25,8 +26,22 @@ logger = logging.getLogger(__name__)
 class DatabaseConnection:
     """Handles database connections and schema management."""
     
-    SCHEMA = '''
+    DB_TIMEOUT = 30.0
+    # Prepared statements kept per connection, so long-lived connections skip re-parsing SQL
+    CACHED_STATEMENTS = 256
+    
+    # Session-scoped settings applied to every connection
+    PRAGMAS = '''
         PRAGMA foreign_keys = ON;
+        PRAGMA synchronous = NORMAL;
+        PRAGMA temp_store = MEMORY;
+        PRAGMA mmap_size = 268435456;
+        PRAGMA cache_size = -20000;
+        PRAGMA busy_timeout = 30000;
+    '''
+    
+    # WAL mode is persistent, so it only needs setting when the schema is created
+    SCHEMA = '''
         PRAGMA journal_mode = WAL;
         
         CREATE TABLE IF NOT EXISTS processes (
@@ -43,19 +58,32 @@ class DatabaseConnection:
             process_id TEXT NOT NULL,
             row_index INTEGER NOT NULL CHECK(row_index >= 0),
             query TEXT NOT NULL,
-            result TEXT NOT NULL,
+            result BLOB NOT NULL,
             created_at TIMESTAMP NOT NULL,
             PRIMARY KEY (process_id, row_index),
             FOREIGN KEY (process_id) REFERENCES processes(process_id)
                 ON DELETE CASCADE
         );
         
+        CREATE TABLE IF NOT EXISTS llm_cache (
+            prompt_hash TEXT PRIMARY KEY,
+            model TEXT NOT NULL,
+            response TEXT NOT NULL,
+            created_at TIMESTAMP NOT NULL
+        );
+        
         CREATE INDEX IF NOT EXISTS idx_process_status ON processes(status, last_updated);
-        CREATE INDEX IF NOT EXISTS idx_config_hash ON processes(config_hash, last_updated);
+        DROP INDEX IF EXISTS idx_config_hash;
+        CREATE INDEX IF NOT EXISTS idx_config_hash_status ON processes(config_hash, status, last_updated DESC);
+        CREATE INDEX IF NOT EXISTS idx_llm_cache_created ON llm_cache(created_at);
     '''
     
     def __init__(self, db_path: Path):
         self.db_path = db_path
+        # Each thread reuses one connection; all of them are tracked so close() can reach them
+        self._local = threading.local()
+        self._connections: Set[sqlite3.Connection] = set()
+        self._connections_lock = threading.Lock()
         # Register adapters and converters for datetime
         sqlite3.register_adapter(datetime, adapt_datetime)
         sqlite3.register_converter("timestamp", convert_datetime)
@@ -66,32 +94,66 @@ class DatabaseConnection:
         with self.get_connection() as conn:
             conn.executescript(self.SCHEMA)
     
+    def connect(self, isolation_level: Optional[str] = 'IMMEDIATE', check_same_thread: bool = True) -> sqlite3.Connection:
+        """Open a new connection with the session PRAGMAs applied.
+        
+        Args:
+            isolation_level: sqlite3 isolation level, or None to manage
+                transactions manually
+            check_same_thread: Whether only the opening thread may use the connection
+                
+        Returns:
+            Configured sqlite3 connection owned by the caller
+        """
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.DB_TIMEOUT,
+            isolation_level=isolation_level,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            cached_statements=self.CACHED_STATEMENTS,
+            check_same_thread=check_same_thread
+        )
+        conn.row_factory = sqlite3.Row
+        conn.executescript(self.PRAGMAS)
+        return conn
+    
+    def _thread_connection(self) -> sqlite3.Connection:
+        """Get the calling thread's connection, opening it on first use."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or conn not in self._connections:
+            # Opened here but closed by close(), possibly from another thread
+            conn = self.connect(check_same_thread=False)
+            with self._connections_lock:
+                self._connections.add(conn)
+            self._local.conn = conn
+        return conn
+    
     @contextmanager
     def get_connection(self) -> Generator[sqlite3.Connection, None, None]:
-        """Get a database connection with retry logic."""
-        MAX_RETRIES = 3
-        DB_TIMEOUT = 30.0
+        """Get this thread's database connection, committing on success and rolling back on error.
         
-        for attempt in range(MAX_RETRIES):
-            conn = None
+        Busy waits are handled by the connection timeout, so operational errors are not retried.
+        """
+        conn = self._thread_connection()
+        try:
+            yield conn
+            conn.commit()
+        except sqlite3.OperationalError as e:
+            conn.rollback()
+            raise DatabaseError(f"Database operation failed: {e}") from e
+        except BaseException:
+            conn.rollback()
+            raise
+    
+    def close(self) -> None:
+        """Close every thread's connection. Threads reopen one on their next query."""
+        with self._connections_lock:
+            connections, self._connections = self._connections, set()
+        for conn in connections:
             try:
-                conn = sqlite3.connect(
-                    self.db_path,
-                    timeout=DB_TIMEOUT,
-                    isolation_level='IMMEDIATE',
-                    detect_types=sqlite3.PARSE_DECLTYPES
-                )
-                conn.row_factory = sqlite3.Row
-                yield conn
-                conn.commit()
-                return
-            except sqlite3.OperationalError as e:
-                if attempt == MAX_RETRIES - 1:
-                    raise DatabaseError(f"Database connection failed: {e}")
-                logger.warning(f"Database connection attempt {attempt + 1} failed, retrying...")
-            finally:
-                if conn:
-                    conn.close()
+                conn.close()
+            except sqlite3.Error as e:
+                logger.error(f"Error closing database connection: {e}")
 
     def row_to_dict(self, row: sqlite3.Row) -> dict:
         """Convert SQLite row to dictionary with proper type conversion."""
@@ -1,17 +1,22 @@
 """Thread-safe singleton manager for caching process results."""
 
-import json
+import sqlite3
 import threading
 import uuid
 import atexit
 import os
+import time
+import zlib
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Optional, Dict, Any
-from queue import Queue, Empty
+from typing import Optional, Dict, Any, List, Tuple
+from queue import Queue, Empty, Full
+
+import orjson
 
 from .models import ProcessStatus
 from .database import DatabaseConnection
+from .exceptions import DatabaseError
 from augmenta.utils.validators import validate_string, validate_int
 
 # logging
@@ -20,22 +25,71 @@ import logfire
 logging.basicConfig(handlers=[logfire.LogfireLoggingHandler()])
 logger = logging.getLogger(__name__)
 
+# Queued by cleanup() to tell the writer thread to exit once earlier writes are flushed
+_STOP = object()
+# Queued by flush() to make the writer thread write held progress updates with its next batch
+_FLUSH = object()
+
+INSERT_PROCESS_SQL = "INSERT INTO processes (process_id, config_hash, start_time, last_updated, status, total_rows) VALUES (?, ?, ?, ?, ?, ?)"
+UPSERT_RESULT_SQL = """
+    INSERT INTO results_cache (process_id, row_index, query, result, created_at) VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT (process_id, row_index) DO UPDATE SET
+        query = excluded.query, result = excluded.result, created_at = excluded.created_at
+"""
+INCREMENT_PROCESSED_SQL = "UPDATE processes SET processed_rows = processed_rows + ?, last_updated = ? WHERE process_id = ?"
+
+# Statements that other queued writes depend on, run before the rest of a batch
+_FIRST_STATEMENTS = (INSERT_PROCESS_SQL,)
+
+# zlib level for cached results; low levels already shrink repetitive JSON several times
+RESULT_COMPRESSION_LEVEL = 3
+
+def _load_result(stored: Any) -> Any:
+    """Parse a cached result, decompressing it unless it predates compression."""
+    if isinstance(stored, bytes):
+        stored = zlib.decompress(stored)
+    return orjson.loads(stored)
+
+# Last (second, ISO string) pair produced by _now_iso()
+_clock = (None, "")
+
+def _now_iso() -> str:
+    """Return the local time as an ISO string to the second, formatting it at most once per second."""
+    global _clock
+    
+    second = int(time.time())
+    cached_second, stamp = _clock
+    if second != cached_second:
+        stamp = time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(second))
+        _clock = (second, stamp)
+    return stamp
+
 class CacheManager:
     """Thread-safe singleton manager for caching process results."""
     
-    _instance = None
+    _instance: Optional['CacheManager'] = None
     _lock = threading.Lock()
     
+    # Most writes the writer thread commits in one transaction
+    BATCH_SIZE = 1000
+    # Seconds between processed-row updates for the same process
+    HEARTBEAT_INTERVAL = 1.0
+    # Queued writes allowed before callers wait for the writer thread to catch up
+    MAX_QUEUED_WRITES = 10_000
+    # Seconds a caller waits for room in a full queue before giving up
+    ENQUEUE_TIMEOUT = 60.0
+    
     def __new__(cls, *args, **kwargs) -> 'CacheManager':
-        if not cls._instance:
-            with cls._lock:
-                if not cls._instance:
-                    cls._instance = super().__new__(cls)
+        with cls._lock:
+            if cls._instance is None:
+                instance = super().__new__(cls)
+                instance.initialized = False
+                cls._instance = instance
         return cls._instance
     
     def __init__(self, cache_dir: Optional[Path] = None, auto_cleanup_days: int = 30) -> None:
         with self._lock:
-            if hasattr(self, 'initialized'):
+            if self.initialized:
                 return
                 
             self.cache_dir = cache_dir or Path(os.getcwd()) / '.augmenta' / 'cache'
@@ -43,9 +97,13 @@ class CacheManager:
             self.db_path = self.cache_dir / 'cache.db'
             self.auto_cleanup_days = auto_cleanup_days
             
-            self.write_queue = Queue()
+            self.write_queue = Queue(maxsize=self.MAX_QUEUED_WRITES)
             self.is_running = True
             
+            # Writer thread state for throttling processed-row updates
+            self._held_increments: List[tuple] = []
+            self._last_heartbeat: Dict[str, float] = {}
+            
             self.db = DatabaseConnection(self.db_path)
             self._start_writer_thread()
             self._cleanup_old_processes()  # Auto-cleanup on startup
@@ -61,76 +119,205 @@ class CacheManager:
         self.writer_thread.start()
     
     def _process_write_queue(self) -> None:
-        """Process database write operations asynchronously."""
-        BATCH_SIZE = 100
+        """Process database write operations in batches on one long-lived connection."""
+        conn = self.db.connect(isolation_level=None)
+        
+        try:
+            stopping = False
+            while not stopping:
+                # Wake up to write held progress updates even if nothing else is queued
+                timeout = self.HEARTBEAT_INTERVAL if self._held_increments else None
+                batch = self._drain_write_queue(self.BATCH_SIZE, timeout)
+                taken = len(batch)
+                if batch and batch[-1] is _STOP:
+                    batch.pop()
+                    stopping = True
+                flushing = _FLUSH in batch
+                if flushing:
+                    batch = [item for item in batch if item is not _FLUSH]
+                try:
+                    batch = self._throttle_heartbeats(batch, flush_all=stopping or flushing)
+                    if batch:
+                        self._write_batch(conn, batch)
+                finally:
+                    # Lets flush() return once everything queued before it is committed
+                    for _ in range(taken):
+                        self.write_queue.task_done()
+        finally:
+            conn.close()
+    
+    def _drain_write_queue(self, batch_size: int, timeout: Optional[float] = None) -> List[Tuple[str, tuple]]:
+        """Wait for a write to be queued, then take whatever else is already queued."""
         batch = []
+        try:
+            batch.append(self.write_queue.get(timeout=timeout))
+            while len(batch) < batch_size and batch[-1] is not _STOP:
+                batch.append(self.write_queue.get_nowait())
+        except Empty:
+            pass
+        return batch
+    
+    def _throttle_heartbeats(self, batch: List[Tuple[str, tuple]], flush_all: bool = False) -> List[Tuple[str, tuple]]:
+        """Add processed-row updates for cached results, at most once per process per interval.
+        
+        Each queued result counts as one processed row. Held increments are merged and
+        written with a later batch, or when the writer stops.
+        """
+        writes = []
+        for item in batch:
+            writes.append(item)
+            if item[0] == UPSERT_RESULT_SQL:
+                process_id, _, _, _, created_at = item[1]
+                self._held_increments.append((1, created_at, process_id))
+        
+        now = time.monotonic()
+        held = []
+        for params in self._coalesce_increments(self._held_increments):
+            process_id = params[2]
+            last = self._last_heartbeat.get(process_id)
+            if flush_all or last is None or now - last >= self.HEARTBEAT_INTERVAL:
+                writes.append((INCREMENT_PROCESSED_SQL, params))
+                self._last_heartbeat[process_id] = now
+            else:
+                held.append(params)
+        self._held_increments = held
+        return writes
+    
+    def _write_batch(self, conn: sqlite3.Connection, batch: List[Tuple[str, tuple]]) -> None:
+        """Write a batch in a single transaction, one executemany per statement."""
+        # Group parameters by statement, keeping the order statements first appeared in
+        statements: Dict[str, List[tuple]] = {}
+        for query, params in batch:
+            statements.setdefault(query, []).append(params)
         
-        while self.is_running or not self.write_queue.empty():
+        # Processes must exist before results referencing them are inserted
+        ordered = sorted(statements.items(), key=lambda item: item[0] not in _FIRST_STATEMENTS)
+        
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for query, params_list in ordered:
+                conn.executemany(query, params_list)
+            conn.execute("COMMIT")
+        except Exception as e:
+            logger.error(f"Error processing write queue, retrying items one at a time: {e}")
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            self._write_items(conn, batch)
+    
+    @staticmethod
+    def _coalesce_increments(params_list: List[tuple]) -> List[tuple]:
+        """Merge processed-row increments into one update per process, keeping the latest timestamp."""
+        merged: Dict[str, List[Any]] = {}
+        for count, updated, process_id in params_list:
+            if process_id in merged:
+                merged[process_id][0] += count
+                merged[process_id][1] = max(merged[process_id][1], updated)
+            else:
+                merged[process_id] = [count, updated]
+        return [(count, updated, process_id) for process_id, (count, updated) in merged.items()]
+    
+    def _write_items(self, conn: sqlite3.Connection, batch: List[Tuple[str, tuple]]) -> None:
+        """Write each item in its own transaction so one bad item can't discard the rest."""
+        for query, params in batch:
             try:
-                try:
-                    while len(batch) < BATCH_SIZE:
-                        item = self.write_queue.get(timeout=1.0)
-                        batch.append(item)
-                except Empty:
-                    pass
-                
-                if batch:
-                    with self.db.get_connection() as conn:
-                        for query, params in batch:
-                            conn.execute(query, params)
-                    batch.clear()
-                    
+                conn.execute("BEGIN IMMEDIATE")
+                conn.execute(query, params)
+                conn.execute("COMMIT")
             except Exception as e:
-                logger.error(f"Error processing write queue: {e}")
-                batch.clear()
+                logger.error(f"Dropping cache write that failed: {e}")
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+    
+    def _enqueue(self, item: Tuple[str, tuple]) -> None:
+        """Queue a write, waiting for the writer thread if the queue is full.
+        
+        Raises:
+            DatabaseError: If the queue stays full for ENQUEUE_TIMEOUT seconds
+        """
+        try:
+            self.write_queue.put_nowait(item)
+        except Full:
+            logger.warning("Cache write queue is full, waiting for the writer thread to catch up")
+            try:
+                self.write_queue.put(item, timeout=self.ENQUEUE_TIMEOUT)
+            except Full:
+                raise DatabaseError(f"Cache writer made no progress for {self.ENQUEUE_TIMEOUT:.0f}s")
     
     def start_process(self, config_hash: str, total_rows: int) -> str:
         """Start a new process and return its ID."""
-        validate_string(config_hash, "Config hash")
-        validate_int(total_rows, "Total rows")
+        if __debug__:
+            validate_string(config_hash, "Config hash")
+            validate_int(total_rows, "Total rows")
             
         process_id = str(uuid.uuid4())
-        current_time = datetime.now()
+        current_time = _now_iso()
         
-        self.write_queue.put((
-            "INSERT INTO processes (process_id, config_hash, start_time, last_updated, status, total_rows) VALUES (?, ?, ?, ?, ?, ?)",
+        self._enqueue((
+            INSERT_PROCESS_SQL,
             (process_id, config_hash, current_time, current_time, 'running', total_rows)
         ))
         return process_id
     
     def cache_result(self, process_id: str, row_index: int, query: str, result: str) -> None:
         """Cache a result for a specific row."""
-        validate_string(process_id, "Process ID")
-        validate_int(row_index, "Row index")
-        validate_string(query, "Query")
-        validate_string(result, "Result")
+        # Argument checks guard internal callers only, so python -O skips them on this hot path
+        if __debug__:
+            validate_string(process_id, "Process ID")
+            validate_int(row_index, "Row index")
+            validate_string(query, "Query")
+            validate_string(result, "Result")
             
-        current_time = datetime.now()
-        
-        self.write_queue.put((
-            "INSERT OR REPLACE INTO results_cache (process_id, row_index, query, result, created_at) VALUES (?, ?, ?, ?, ?)",
-            (process_id, row_index, query, result, current_time)
-        ))
+        current_time = _now_iso()
         
-        self.write_queue.put((
-            "UPDATE processes SET processed_rows = processed_rows + 1, last_updated = ? WHERE process_id = ?",
-            (current_time, process_id)
+        self._enqueue((
+            UPSERT_RESULT_SQL,
+            (process_id, row_index, query, zlib.compress(result.encode(), RESULT_COMPRESSION_LEVEL), current_time)
         ))
     
     def get_cached_results(self, process_id: str) -> Dict[int, Any]:
         """Get all cached results for a process."""
-        validate_string(process_id, "Process ID")
+        if __debug__:
+            validate_string(process_id, "Process ID")
             
         with self.db.get_connection() as conn:
-            rows = conn.execute(
+            cursor = conn.execute(
                 "SELECT row_index, result FROM results_cache WHERE process_id = ?",
                 (process_id,)
-            ).fetchall()
-            return {row['row_index']: json.loads(row['result']) for row in rows}
+            )
+            return {row_index: _load_result(result) for row_index, result in cursor}
+    
+    def cache_llm_response(self, prompt_hash: str, model: str, response: str) -> None:
+        """Cache an LLM response so later runs can reuse it for the same prompt."""
+        if __debug__:
+            validate_string(prompt_hash, "Prompt hash")
+            validate_string(model, "Model")
+            validate_string(response, "Response")
+        
+        self._enqueue((
+            """
+            INSERT INTO llm_cache (prompt_hash, model, response, created_at) VALUES (?, ?, ?, ?)
+            ON CONFLICT (prompt_hash) DO UPDATE SET
+                model = excluded.model, response = excluded.response, created_at = excluded.created_at
+            """,
+            (prompt_hash, model, response, _now_iso())
+        ))
+    
+    def get_llm_response(self, prompt_hash: str) -> Optional[Any]:
+        """Get a cached LLM response for a prompt hash, if there is one."""
+        if __debug__:
+            validate_string(prompt_hash, "Prompt hash")
+        
+        with self.db.get_connection() as conn:
+            row = conn.execute(
+                "SELECT response FROM llm_cache WHERE prompt_hash = ?",
+                (prompt_hash,)
+            ).fetchone()
+            return orjson.loads(row['response']) if row else None
     
     def get_process_status(self, process_id: str) -> Optional[ProcessStatus]:
         """Get the status of a process."""
-        validate_string(process_id, "Process ID")
+        if __debug__:
+            validate_string(process_id, "Process ID")
             
         with self.db.get_connection() as conn:
             row = conn.execute(
@@ -145,7 +332,8 @@ class CacheManager:
     
     def find_unfinished_process(self, config_hash: str) -> Optional[ProcessStatus]:
         """Find the most recent unfinished process for a config hash."""
-        validate_string(config_hash, "Config hash")
+        if __debug__:
+            validate_string(config_hash, "Config hash")
             
         with self.db.get_connection() as conn:
             row = conn.execute("""
@@ -175,47 +363,74 @@ class CacheManager:
             f"({process.progress:.1f}%)"
         )
     
+    def resume_process(self, process_id: str) -> None:
+        """Mark a process as running again."""
+        if __debug__:
+            validate_string(process_id, "Process ID")
+        self._enqueue((
+            "UPDATE processes SET status = 'running', last_updated = ? WHERE process_id = ?",
+            (_now_iso(), process_id)
+        ))
+    
     def mark_process_completed(self, process_id: str) -> None:
         """Mark a process as completed."""
-        validate_string(process_id, "Process ID")
-        self.write_queue.put((
+        if __debug__:
+            validate_string(process_id, "Process ID")
+        self._enqueue((
             "UPDATE processes SET status = 'completed', last_updated = ? WHERE process_id = ?",
-            (datetime.now(), process_id)
+            (_now_iso(), process_id)
         ))
     
     def _cleanup_old_processes(self) -> None:
         """Clean up processes older than the specified days."""
         try:
-            cutoff = datetime.now() - timedelta(days=self.auto_cleanup_days)
+            cutoff = (datetime.now() - timedelta(days=self.auto_cleanup_days)).isoformat()
             with self.db.get_connection() as conn:
                 result = conn.execute("DELETE FROM processes WHERE last_updated < ?", (cutoff,))
                 if result.rowcount > 0:
                     logger.info(f"Cleaned up {result.rowcount} old processes from cache")
+                conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (cutoff,))
         except Exception as e:
             logger.error(f"Error during automatic cache cleanup: {e}")
     
     def cleanup_old_processes(self, days: int = 30) -> None:
         """Clean up processes older than specified days."""
         validate_int(days, "Days")
-        cutoff = datetime.now() - timedelta(days=days)
+        cutoff = (datetime.now() - timedelta(days=days)).isoformat()
         with self.db.get_connection() as conn:
             conn.execute("DELETE FROM processes WHERE last_updated < ?", (cutoff,))
+            conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (cutoff,))
+    
+    def flush(self) -> None:
+        """Block until every write queued so far, including held progress updates, has been committed."""
+        if self.writer_thread.is_alive():
+            self.write_queue.put(_FLUSH)
+            self.write_queue.join()
     
     def close_connections(self) -> None:
         """Close all database connections."""
-        self.is_running = False
-        if hasattr(self, 'writer_thread'):
-            try:
-                # Wait for writer thread to finish
-                self.writer_thread.join(timeout=5.0)
-            except Exception as e:
-                logger.error(f"Error joining writer thread: {e}")
+        self.cleanup()
     
     def cleanup(self) -> None:
-        """Cleanup method called on program exit."""
-        self.is_running = False
-        if hasattr(self, 'writer_thread'):
+        """Stop the writer thread after flushing pending writes. Safe to call repeatedly."""
+        with self._lock:
+            if not self.is_running:
+                return
+            self.is_running = False
+            
+        atexit.unregister(self.cleanup)
+        if hasattr(self, 'writer_thread') and self.writer_thread.is_alive():
             try:
-                self.writer_thread.join(timeout=5.0)
-            except Exception as e:
-                logger.error(f"Error during cleanup: {e}")
\ No newline at end of file
+                self.write_queue.put(_STOP, timeout=self.ENQUEUE_TIMEOUT)
+            except Full:
+                logger.error(f"Cache writer made no progress for {self.ENQUEUE_TIMEOUT:.0f}s, "
+                             f"{self.write_queue.qsize()} queued writes were not saved")
+            else:
+                # No timeout: the writer exits as soon as everything queued before the stop marker is written
+                try:
+                    self.writer_thread.join()
+                except Exception as e:
+                    logger.error(f"Error during cleanup: {e}")
+        elif not self.write_queue.empty():
+            logger.error(f"Cache writer thread is not running, {self.write_queue.qsize()} queued writes were not saved")
+        self.db.close()
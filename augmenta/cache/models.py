@@ -9,7 +9,7 @@ from .exceptions import ValidationError
 
 ProcessStatusType = Literal['running', 'completed']
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ProcessStatus:
     """Immutable data class representing process status information."""
     process_id: str
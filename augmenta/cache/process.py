@@ -1,18 +1,41 @@
 """Process-specific caching operations."""
 
-from datetime import datetime
+import os
+from functools import lru_cache
 import click
 import pandas as pd
 from typing import Optional, Dict, Any, Tuple
 from pathlib import Path
 
 from augmenta.utils.get_hash import get_hash
+from augmenta.utils.dataframe import assign_columns
 from .manager import CacheManager
 
 def get_cache_manager() -> CacheManager:
     """Get the singleton cache manager instance."""
     return CacheManager()
 
+@lru_cache(maxsize=32)
+def _file_hash(path: str, mtime_ns: int, size: int) -> str:
+    """Hash a file's contents. The modification time and size key the memo so edits rehash."""
+    return get_hash(path)
+
+def get_run_hash(config_data: Dict[str, Any]) -> str:
+    """Hash the configuration together with the contents of its input CSV.
+    
+    Args:
+        config_data: Configuration dictionary
+        
+    Returns:
+        Hash identifying runs over the same configuration and input
+    """
+    csv_path = os.fspath(config_data["input_csv"])
+    stat = os.stat(csv_path)
+    return get_hash({
+        'config': get_hash(config_data),
+        'csv': _file_hash(csv_path, stat.st_mtime_ns, stat.st_size)
+    })
+
 def setup_cache_handling(
     config_data: Dict[str, Any],
     config_path: Path,
@@ -40,12 +63,11 @@ def setup_cache_handling(
     # Initialize cache manager once
     cache_manager = get_cache_manager()
     
+    combined_hash = None
+    
     # Skip resumption if explicitly provided or disabled
     if not process_id and auto_resume:
-        # Generate hash for config and input data
-        config_hash = get_hash(config_data)
-        csv_hash = get_hash(config_data["input_csv"])
-        combined_hash = get_hash({'config': config_hash, 'csv': csv_hash})
+        combined_hash = get_run_hash(config_data)
         
         # Check for unfinished process
         if unfinished_process := cache_manager.find_unfinished_process(combined_hash):
@@ -56,18 +78,13 @@ def setup_cache_handling(
     
     # Set up or resume process
     if not process_id:
-        # Start new process
-        config_hash = get_hash(config_data)
-        csv_hash = get_hash(config_data["input_csv"])
-        combined_hash = get_hash({'config': config_hash, 'csv': csv_hash})
+        # Start new process, reusing the hash from the resume check if there was one
+        if combined_hash is None:
+            combined_hash = get_run_hash(config_data)
         process_id = cache_manager.start_process(combined_hash, len(df))
     else:
-        # Update existing process
-        with cache_manager.db.get_connection() as conn:
-            conn.execute(
-                "UPDATE processes SET status = 'running', last_updated = ? WHERE process_id = ?",
-                (datetime.now(), process_id)
-            )
+        # Update existing process; cached results are already on disk, so there is nothing to wait for
+        cache_manager.resume_process(process_id)
     
     # Get cached results
     cached_results = cache_manager.get_cached_results(process_id)
@@ -77,16 +94,26 @@ def setup_cache_handling(
 def apply_cached_results(
     df: pd.DataFrame,
     process_id: str,
-    cache_manager: Optional[CacheManager] = None
+    cache_manager: Optional[CacheManager] = None,
+    cached_results: Optional[Dict[int, Any]] = None
 ) -> pd.DataFrame:
-    """Apply cached results to a DataFrame."""
-    if cache_manager is None:
-        cache_manager = get_cache_manager()
+    """Apply cached results to a DataFrame.
+    
+    Args:
+        df: DataFrame to update in place
+        process_id: Process whose results to apply
+        cache_manager: Optional cache manager
+        cached_results: Results already fetched for the process, to avoid reading them again
         
-    cached_results = cache_manager.get_cached_results(process_id)
-    for row_index, result in cached_results.items():
-        for key, value in result.items():
-            df.at[row_index, key] = value
+    Returns:
+        The updated DataFrame
+    """
+    if cached_results is None:
+        if cache_manager is None:
+            cache_manager = get_cache_manager()
+        cached_results = cache_manager.get_cached_results(process_id)
+        
+    assign_columns(df, cached_results)
     return df
 
 def handle_cache_cleanup(cache_manager: Optional[Any] = None) -> None:
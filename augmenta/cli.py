@@ -3,7 +3,6 @@
 import click
 import os
 import asyncio
-import yaml
 from typing import Dict, Any, Optional, Tuple
 from colorama import Fore, Style, init
 import pandas as pd
@@ -13,7 +12,8 @@ os.environ["LOGFIRE_IGNORE_NO_CONFIG"] = "1"
 
 from augmenta.augmenta import process_augmenta
 from augmenta.cache.process import handle_cache_cleanup
-from augmenta.config.get_credentials import CredentialsManager
+from augmenta.config.get_credentials import get_credentials_manager
+from augmenta.config.read_config import load_yaml
 import logfire
 import logfire
 
@@ -53,8 +53,7 @@ class ConsolePrinter:
 
 def get_api_keys(config_data: Dict[str, Any], interactive: bool = False) -> Dict[str, str]:
     """Get required API keys from environment or user input."""
-    credentials_manager = CredentialsManager()
-    required_keys = credentials_manager.get_required_keys(config_data)
+    required_keys = get_credentials_manager().get_required_keys(config_data)
     keys = {key: os.getenv(key) for key in required_keys}
     
     if interactive:
@@ -169,7 +168,7 @@ def main(
 
         # Load configuration
         with open(config_path, 'r', encoding='utf-8') as f:
-            config_data = yaml.safe_load(f)
+            config_data = load_yaml(f)
 
         # Configure logging
         configure_logging(config_data, verbose)
@@ -1,4 +1,4 @@
 """Configuration management module for Augmenta."""
-from .get_credentials import CredentialsManager
+from .get_credentials import CredentialsManager, get_credentials_manager
 
-__all__ = ['CredentialsManager']
\ No newline at end of file
+__all__ = ['CredentialsManager', 'get_credentials_manager']
\ No newline at end of file
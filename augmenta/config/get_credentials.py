@@ -1,29 +1,58 @@
 """Manages API credentials and authentication for various services."""
 
 import os
-from typing import Dict, Set, List, Any
+from functools import cache
+from typing import Dict, FrozenSet, Set, Any
 from pathlib import Path
 from dotenv import load_dotenv, find_dotenv
+
+# logging
 import logging
+import logfire
+logging.basicConfig(handlers=[logfire.LogfireLoggingHandler()])
+logger = logging.getLogger(__name__)
+
+@cache
+def _load_env_file(cwd: str) -> None:
+    """Load the .env file for a working directory into the environment, once per directory."""
+    # Try to load from current directory first, then search upwards
+    env_path = Path(cwd) / '.env'
+    if env_path.exists():
+        load_dotenv(env_path)
+        logger.info("Loaded .env from: %s", env_path)
+    else:
+        # Try to find any .env file in parent directories
+        dotenv_path = find_dotenv(usecwd=True)
+        if dotenv_path:
+            load_dotenv(dotenv_path)
+            logger.info("Loaded .env from: %s", dotenv_path)
+        else:
+            logger.warning("No .env file found in %s or parent directories", env_path.parent)
 
 class CredentialsManager:
     """Manages API credentials and keys for various services."""
     
+    # Keys needed by each model provider and search engine, by lowercase name
+    MODEL_PROVIDER_KEYS: Dict[str, FrozenSet[str]] = {
+        "openai": frozenset({"OPENAI_API_KEY"}),
+        "anthropic": frozenset({"ANTHROPIC_API_KEY"}),
+    }
+    SEARCH_ENGINE_KEYS: Dict[str, FrozenSet[str]] = {
+        "brave": frozenset({"BRAVE_API_KEY"}),
+        "brightdata": frozenset({"BRIGHTDATA_API_KEY", "BRIGHTDATA_ZONE"}),
+        "google": frozenset({"GOOGLE_API_KEY", "GOOGLE_SEARCH_ENGINE_ID"}),
+        "oxylabs": frozenset({"OXYLABS_USERNAME", "OXYLABS_PASSWORD"}),
+    }
+    
     def __init__(self) -> None:
         """Initialize the credentials manager."""
-        # Try to load from current directory first, then search upwards
-        env_path = Path(os.getcwd()) / '.env'
-        if env_path.exists():
-            load_dotenv(env_path)
-            logging.info(f"Loaded .env from: {env_path}")
-        else:
-            # Try to find any .env file in parent directories
-            dotenv_path = find_dotenv()
-            if dotenv_path:
-                load_dotenv(dotenv_path)
-                logging.info(f"Loaded .env from: {dotenv_path}")
-            else:
-                logging.warning(f"No .env file found in {env_path.parent} or parent directories")
+        _load_env_file(os.getcwd())
+    
+    @staticmethod
+    def refresh() -> None:
+        """Read the .env file again, e.g. after it has been added or edited."""
+        _load_env_file.cache_clear()
+        _load_env_file(os.getcwd())
 
     def get_credentials(self, required_keys: Set[str]) -> Dict[str, str]:
         """Get and validate credentials from environment or config.
@@ -37,6 +66,9 @@ class CredentialsManager:
         Raises:
             ValueError: If any required credentials are missing
         """
+        # The manager is shared, so pick up the .env of whatever directory we're now in; a cache hit otherwise
+        _load_env_file(os.getcwd())
+        
         credentials = {
             key: os.getenv(key)
             for key in required_keys
@@ -62,27 +94,15 @@ class CredentialsManager:
         Returns:
             Set of required API key names
         """
-        required_keys = set()
-        
-        # Check model provider
         model_provider = config_data.get("model", {}).get("provider", "").lower()
-        if model_provider == "openai":
-            required_keys.add("OPENAI_API_KEY")
-        elif model_provider == "anthropic":
-            required_keys.add("ANTHROPIC_API_KEY")
-            
-        # Check search engine
         search_engine = config_data.get("search", {}).get("engine", "").lower()
-        if search_engine == "brave":
-            required_keys.add("BRAVE_API_KEY")
-        elif search_engine == "brightdata":
-            required_keys.add("BRIGHTDATA_API_KEY")
-            required_keys.add("BRIGHTDATA_ZONE")
-        elif search_engine == "google":
-            required_keys.add("GOOGLE_API_KEY")
-            required_keys.add("GOOGLE_SEARCH_ENGINE_ID")
-        elif search_engine == "oxylabs":
-            required_keys.add("OXYLABS_USERNAME")
-            required_keys.add("OXYLABS_PASSWORD")
-            
-        return required_keys
+        
+        return set(
+            self.MODEL_PROVIDER_KEYS.get(model_provider, frozenset())
+            | self.SEARCH_ENGINE_KEYS.get(search_engine, frozenset())
+        )
+
+@cache
+def get_credentials_manager() -> CredentialsManager:
+    """Get the shared credentials manager instance."""
+    return CredentialsManager()
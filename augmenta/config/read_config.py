@@ -1,9 +1,14 @@
 """Configuration handling for the Augmenta package."""
 
 import yaml
-from typing import Dict, Any, Set, Union
+from typing import Dict, Any, Set, Union, IO
 from pathlib import Path
 
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader
+
 # Store loaded config
 _config_data: Dict[str, Any] = {}
 
@@ -14,6 +19,17 @@ REQUIRED_CONFIG_FIELDS: Set[str] = {
     "search"
 }
 
+def load_yaml(stream: Union[str, IO]) -> Any:
+    """Parse YAML safely, using the libyaml-backed loader when available.
+    
+    Args:
+        stream: YAML string or open file
+        
+    Returns:
+        Parsed YAML content
+    """
+    return yaml.load(stream, Loader=SafeLoader)
+
 def validate_config(config: Dict[str, Any]) -> None:
     """Validate configuration data structure and required fields.
     
@@ -125,7 +141,7 @@ def load_config(config_path: Union[str, Path]) -> Dict[str, Any]:
     
     # Always reload the configuration when explicitly requested
     with open(config_path, 'r', encoding='utf-8') as f:
-        config = yaml.safe_load(f)
+        config = load_yaml(f)
         if not config:
             raise ValueError(f"Empty or invalid configuration file: {config_path}")
             
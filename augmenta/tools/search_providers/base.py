@@ -1,8 +1,8 @@
 from abc import ABC, abstractmethod, abstractproperty
 from typing import Optional, List, Dict, Set, ClassVar, Dict, Any, Union
-import httpx
 from tenacity import AsyncRetrying, stop_after_attempt, wait_fixed
 from augmenta.utils.limiter import RateLimitManager
+from augmenta.utils.http_client import get_http_client
 
 # logging
 import logging
@@ -39,17 +39,16 @@ class SearchProvider(ABC):
         logger.debug(f"Making {method} request to {url}")
         async for attempt in AsyncRetrying(stop=stop_after_attempt(3), wait=wait_fixed(2)):
             with attempt:
-                async with httpx.AsyncClient() as client:
-                    response = await client.request(
-                        method,
-                        url,
-                        follow_redirects=True,
-                        timeout=20.0,
-                        **kwargs
-                    )
-                    response.raise_for_status()
-                    return (response.json() if response.headers.get('content-type', '').startswith('application/json')
-                           else response.text)
+                response = await get_http_client().request(
+                    method,
+                    url,
+                    follow_redirects=True,
+                    timeout=20.0,
+                    **kwargs
+                )
+                response.raise_for_status()
+                return (response.json() if response.headers.get('content-type', '').startswith('application/json')
+                       else response.text)
         
         logger.error("Request failed after 3 attempts")
         return None
@@ -2,7 +2,7 @@
 
 from typing import Dict, List
 from .search_providers import PROVIDERS
-from ..config.get_credentials import CredentialsManager
+from ..config.get_credentials import get_credentials_manager
 from ..config.read_config import get_config
 
 async def search_web(query: str) -> List[Dict[str, str]]:
@@ -21,8 +21,7 @@ async def search_web(query: str) -> List[Dict[str, str]]:
         results = search_config.get("results", 5)
 
         provider_class = PROVIDERS[engine]
-        credentials_manager = CredentialsManager()
-        credentials = credentials_manager.get_credentials(provider_class.required_credentials)
+        credentials = get_credentials_manager().get_credentials(provider_class.required_credentials)
         search_provider = provider_class(credentials=credentials)
         search_results = await search_provider._search_implementation(
             query=query,
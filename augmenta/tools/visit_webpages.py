@@ -1,10 +1,20 @@
 import httpx
 from typing import Optional, Final, List, Tuple, Dict
-from httpx import TimeoutException, RequestError
+from httpx import HTTPStatusError, TimeoutException, TransportError, RequestError, UnsupportedProtocol, LocalProtocolError
+from tenacity import AsyncRetrying, RetryCallState, retry_if_exception, stop_after_attempt, stop_after_delay
 from trafilatura import extract
 from trafilatura.settings import use_config
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
+import multiprocessing
+import os
+import random
+import re
+import time
+from urllib.parse import urlsplit, urlunsplit
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from ..utils.http_client import get_http_client
 
 # logging
 import logging
@@ -12,10 +22,123 @@ import logfire
 logging.basicConfig(handlers=[logfire.LogfireLoggingHandler()])
 logger = logging.getLogger(__name__)
 
+# URLs worth fetching: http(s) with a host. Anything else is skipped before any network work.
+# The pattern only anchors the scheme and host, so matching is linear with no backtracking
+FETCHABLE_URL_PATTERN = re.compile(r"\Ahttps?://[^\s/?#]+", re.IGNORECASE)
+MAX_URL_LENGTH = 2048
+
+def _is_fetchable_url(url: str) -> bool:
+    """Check that a URL is a plausible http(s) address worth requesting."""
+    return len(url) <= MAX_URL_LENGTH and FETCHABLE_URL_PATTERN.match(url) is not None
+
+def _canonical_url(url: str) -> str:
+    """Reduce a URL to what the server sees: no fragment, lowercase scheme and host."""
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return url
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, parts.query, ""))
+
+# Redirect targets that mean a host wants us to sign in; its pages then only yield the login form
+# Only whole path segments count, so /authors/ or /authentic-leadership don't match
+LOGIN_WALL_PATTERN = re.compile(r"(?:^|/)(?:log-?in|sign-?in|auth|oauth|sso)(?:/|$)", re.IGNORECASE)
+# Seconds a host stays skipped after redirecting to a login page
+LOGIN_WALL_TTL = 3600.0
+
+# Host -> monotonic time until which its pages are skipped
+_login_walls: Dict[str, float] = {}
+
+def _host(url: str) -> str:
+    """Get the lowercase host of a URL, or an empty string if it has none."""
+    try:
+        return urlsplit(url).netloc.lower()
+    except ValueError:
+        return ""
+
+def _remember_login_wall(url: str) -> None:
+    """Skip further pages on a URL's host for LOGIN_WALL_TTL seconds."""
+    _login_walls[_host(url)] = time.monotonic() + LOGIN_WALL_TTL
+
+def _redirected_to_login(url: str, final_path: str) -> bool:
+    """Check whether a request for a non-login page ended up on a login page."""
+    try:
+        requested_path = urlsplit(url).path
+    except ValueError:
+        return False
+    return LOGIN_WALL_PATTERN.search(final_path) is not None and LOGIN_WALL_PATTERN.search(requested_path) is None
+
+def _behind_login_wall(url: str) -> bool:
+    """Check whether a URL's host recently redirected to a login page."""
+    return _login_walls.get(_host(url), 0.0) > time.monotonic()
+
+# Extraction settings, built once per process; pool workers rebuild them on import instead of unpickling them per page
+TRAFILATURA_CONFIG = use_config()
+TRAFILATURA_CONFIG.set("DEFAULT", "MIN_EXTRACTED_SIZE", "50")
+TRAFILATURA_CONFIG.set("DEFAULT", "MIN_OUTPUT_SIZE", "50")
+
+# Pages smaller than this are extracted on a thread in this process, where IPC would cost more than it saves
+THREAD_EXTRACTION_CHARS = 64_000
+
+# Pools that may break before large pages stay on threads for the rest of the run
+MAX_POOL_BREAKS = 2
+
+_extraction_pool: Optional[ProcessPoolExecutor] = None
+_extraction_pool_breaks = 0
+# Set once worker processes have failed to start or kept dying, so later large pages go straight to a thread
+_extraction_pool_unavailable = False
+
+def _get_extraction_pool() -> Optional[ProcessPoolExecutor]:
+    """Get the process pool used to extract large pages outside the GIL, starting it on first use.
+    
+    Workers re-import the caller's main module, so scripts that call Augmenta
+    must do so under ``if __name__ == "__main__":``.
+    
+    Returns:
+        The shared pool, or None if worker processes can't be started here
+    """
+    global _extraction_pool, _extraction_pool_unavailable
+    
+    if _extraction_pool is None and not _extraction_pool_unavailable:
+        # Forking while another thread is mid-extraction can copy its held locks into the worker and
+        # deadlock it, so where the platform has one, workers come from a clean fork server instead
+        context = None
+        if "forkserver" in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context("forkserver")
+            context.set_forkserver_preload([__name__])
+        try:
+            _extraction_pool = ProcessPoolExecutor(max_workers=os.cpu_count(), mp_context=context)
+        except (OSError, ValueError, NotImplementedError) as e:
+            logger.error(f"Could not start extraction processes, extracting large pages on threads: {str(e)}")
+            _extraction_pool_unavailable = True
+    return _extraction_pool
+
+def _extract_markdown(html_content: str) -> Optional[str]:
+    """Extract markdown from HTML with trafilatura. Runs on a worker thread or in a pool process."""
+    # fast skips the readability/justext fallback passes, which reparse the whole page
+    return extract(
+        html_content,
+        config=TRAFILATURA_CONFIG,
+        output_format="markdown",
+        include_tables=True,
+        include_comments=False,
+        fast=True
+    )
+
 class HTTPProvider:
     """Provider that fetches content using direct HTTP requests via httpx."""
     
     USER_AGENT: Final[str] = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/111.0.0.0 Safari/537.36"
+    # Bytes of a page read at most; anything past this is dropped rather than buffered
+    MAX_CONTENT_BYTES: Final[int] = 4 * 1024 * 1024
+    # Content types worth extracting text from
+    TEXT_CONTENT_TYPES: Final[Tuple[str, ...]] = ("text/html", "text/plain", "application/xhtml+xml")
+    
+    # Attempts per page for failures that are likely to clear up on their own
+    MAX_ATTEMPTS: Final[int] = 3
+    RETRY_STATUSES: Final[frozenset] = frozenset({429, 502, 503, 504})
+    # First retry waits about this many seconds, doubling each time; Retry-After is capped at MAX_RETRY_DELAY
+    RETRY_BASE_DELAY: Final[float] = 0.5
+    MAX_RETRY_DELAY: Final[float] = 10.0
     
     async def get_content(self, url: str, timeout: int = 30) -> Optional[str]:
         timeout_settings = httpx.Timeout(
@@ -28,22 +151,29 @@ class HTTPProvider:
             "User-Agent": self.USER_AGENT
         }
         
+        if _behind_login_wall(url):
+            logger.info(f"Skipping {url}: host redirects to a login page")
+            return None
+        
+        retrying = AsyncRetrying(
+            # Retrying stops once the page's own timeout has passed, so a dead host holds its slot once, not per attempt
+            stop=stop_after_attempt(self.MAX_ATTEMPTS) | stop_after_delay(timeout),
+            wait=self._wait_before_retry,
+            retry=retry_if_exception(self._is_transient),
+            before_sleep=lambda state: logger.warning(
+                f"Retrying {url} in {state.next_action.sleep:.1f}s "
+                f"(attempt {state.attempt_number + 1} of {self.MAX_ATTEMPTS})"
+            ),
+            reraise=True
+        )
+        
         try:
-            async with httpx.AsyncClient(timeout=timeout_settings, headers=headers) as client:
-                response = await client.get(url, follow_redirects=True)
-                response.raise_for_status()
-                
-                if response.status_code != 200:
-                    logger.warning(f"HTTP {response.status_code} for {url}")
-                    return None
-                
-                if not response.headers.get('content-type', '').startswith('text/'):
-                    logger.warning(f"Unsupported content type for {url}")
-                    return None
-                
-                content = response.text
-                return content if content else None
-                
+            async for attempt in retrying:
+                with attempt:
+                    return await self._fetch(url, headers, timeout_settings)
+        except HTTPStatusError as e:
+            logger.error(f"HTTP error for {url}: {str(e)}")
+            return None
         except TimeoutException as e:
             logger.error(f"Timeout error for {url}: {str(e)}")
             return None
@@ -53,15 +183,80 @@ class HTTPProvider:
         except Exception as e:
             logger.error(f"Unexpected error for {url}: {str(e)}")
             return None
+    
+    def _is_transient(self, error: BaseException) -> bool:
+        """Whether a failed fetch is worth retrying: a dropped connection, timeout or overloaded server."""
+        if isinstance(error, HTTPStatusError):
+            return error.response.status_code in self.RETRY_STATUSES
+        # Bad URLs and requests we built wrongly fail the same way every time
+        if isinstance(error, (UnsupportedProtocol, LocalProtocolError)):
+            return False
+        return isinstance(error, TransportError)
+    
+    def _wait_before_retry(self, retry_state: RetryCallState) -> float:
+        """tenacity wait callback that honours the failed response's Retry-After header."""
+        error = retry_state.outcome.exception()
+        retry_after = error.response.headers.get('retry-after') if isinstance(error, HTTPStatusError) else None
+        return self._retry_delay(retry_state.attempt_number, retry_after)
+    
+    def _retry_delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Seconds to wait before the next attempt: the server's Retry-After if given, else jittered backoff."""
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), self.MAX_RETRY_DELAY)
+        backoff = self.RETRY_BASE_DELAY * 2 ** (attempt - 1)
+        return min(backoff + random.uniform(0, backoff), self.MAX_RETRY_DELAY)
+    
+    async def _fetch(self, url: str, headers: Dict[str, str], timeout_settings: httpx.Timeout) -> Optional[str]:
+        """Fetch a page once, raising httpx errors for the caller to retry or report."""
+        # The shared client keeps connections open across pages and rows
+        client = get_http_client()
+        async with client.stream("GET", url, headers=headers, timeout=timeout_settings, follow_redirects=True) as response:
+            response.raise_for_status()
+            
+            if response.status_code != 200:
+                logger.warning(f"HTTP {response.status_code} for {url}")
+                return None
+            
+            # A redirect to a login page means the rest of the host is walled off too
+            if response.history and _redirected_to_login(url, response.url.path):
+                # Only a host sending its own pages to its own login is walled; shorteners and
+                # aggregators that hand off to another site's sign-in are not
+                last_hop = str(response.history[-1].url)
+                if _host(last_hop) == _host(str(response.url)):
+                    logger.warning(f"Login wall for {url}, skipping {_host(last_hop)} for {LOGIN_WALL_TTL:.0f}s")
+                    _remember_login_wall(last_hop)
+                else:
+                    logger.warning(f"Login wall for {url}")
+                return None
+            
+            # Decide from the headers alone, so skipped pages never download their body
+            if not response.headers.get('content-type', '').lower().startswith(self.TEXT_CONTENT_TYPES):
+                logger.warning(f"Unsupported content type for {url}")
+                return None
+            
+            content_length = response.headers.get('content-length', '')
+            if content_length.isdigit() and int(content_length) > self.MAX_CONTENT_BYTES:
+                logger.warning(f"Skipping {url}: {content_length} bytes exceeds {self.MAX_CONTENT_BYTES}")
+                return None
+            
+            body = bytearray()
+            async for chunk in response.aiter_bytes():
+                body.extend(chunk)
+                if len(body) >= self.MAX_CONTENT_BYTES:
+                    logger.warning(f"Truncated {url} at {self.MAX_CONTENT_BYTES} bytes")
+                    del body[self.MAX_CONTENT_BYTES:]
+                    break
+            
+        # Decode once with the declared charset instead of sniffing the encoding
+        try:
+            content = body.decode(response.charset_encoding or "utf-8", errors="replace")
+        except LookupError:
+            content = body.decode("utf-8", errors="replace")
+        return content if content else None
 
 class TrafilaturaProvider:
     """Provider that extracts text content using Trafilatura."""
     
-    def __init__(self):
-        self.config = use_config()
-        self.config.set("DEFAULT", "MIN_EXTRACTED_SIZE", "50")
-        self.config.set("DEFAULT", "MIN_OUTPUT_SIZE", "50")
-    
     async def get_content(self, html_content: str, timeout: int = 30) -> Optional[str]:
         """Extract text content from HTML using trafilatura.
         
@@ -72,13 +267,34 @@ class TrafilaturaProvider:
         Returns:
             Optional[str]: Extracted markdown text if successful, None otherwise
         """
+        global _extraction_pool, _extraction_pool_breaks, _extraction_pool_unavailable
+        
         try:
-            extracted = extract(
-                html_content,
-                config=self.config,
-                output_format="markdown",
-                include_tables=True
-            )
+            pool = _get_extraction_pool() if len(html_content) >= THREAD_EXTRACTION_CHARS else None
+            if pool is None:
+                # Off the event loop, so other fetches keep moving while the page is parsed
+                extracted = await asyncio.to_thread(_extract_markdown, html_content)
+            else:
+                # Parsing is CPU-bound, so large pages go to other processes to run in parallel
+                loop = asyncio.get_running_loop()
+                try:
+                    extracted = await loop.run_in_executor(pool, _extract_markdown, html_content)
+                except OSError as e:
+                    # Workers start on first use, so this is where a platform that can't start them fails
+                    logger.error(f"Could not start extraction processes, extracting large pages on threads: {str(e)}")
+                    _extraction_pool = None
+                    _extraction_pool_unavailable = True
+                    extracted = await asyncio.to_thread(_extract_markdown, html_content)
+                except BrokenProcessPool as e:
+                    # A worker died or couldn't bootstrap. Every page in flight sees this, so only the
+                    # first counts the break and drops the pool; all of them retry on a thread
+                    if _extraction_pool is pool:
+                        _extraction_pool = None
+                        _extraction_pool_breaks += 1
+                        _extraction_pool_unavailable = _extraction_pool_breaks >= MAX_POOL_BREAKS
+                        pool.shutdown(wait=False)
+                        logger.error(f"Extraction process failed, retrying on a thread: {str(e)}")
+                    extracted = await asyncio.to_thread(_extract_markdown, html_content)
             
             return extracted if extracted and len(extracted) >= 50 else None
             
@@ -122,9 +338,18 @@ async def visit_webpages(urls: List[str], max_workers: int = 10, timeout: int =
     semaphore = asyncio.Semaphore(max_workers)
     
     async def process_with_semaphore(url: str) -> Tuple[str, Optional[str]]:
+        if not _is_fetchable_url(url):
+            logger.warning(f"Skipping unsupported URL: {url}")
+            return {"url": url, "content": ""}
         async with semaphore:
             return await process_url(url)
 
-    tasks = [process_with_semaphore(url) for url in urls]
-    results = await asyncio.gather(*tasks)
-    return results
\ No newline at end of file
+    # Fetch each distinct page once, then answer every position it was requested in
+    keys = [_canonical_url(url) for url in urls]
+    unique_urls: Dict[str, str] = {}
+    for key, url in zip(keys, urls):
+        unique_urls.setdefault(key, url)
+    
+    tasks = [process_with_semaphore(url) for url in unique_urls.values()]
+    contents = {key: result["content"] for key, result in zip(unique_urls, await asyncio.gather(*tasks))}
+    return [{"url": url, "content": contents[key]} for key, url in zip(keys, urls)]
\ No newline at end of file
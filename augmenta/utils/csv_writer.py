@@ -0,0 +1,76 @@
+"""Incremental CSV output for processed rows."""
+
+import csv
+import os
+from pathlib import Path
+from typing import Any, Dict, Hashable, Iterable, List, Union
+
+import pandas as pd
+
+class OrderedCSVWriter:
+    """Write rows to a CSV file in input order as soon as they are available.
+
+    Rows may complete in any order. Each one is held back until every row
+    before it has been written, so the file always contains a complete,
+    correctly ordered prefix of the output.
+
+    Rows go to a ``.partial`` file next to the output, which only replaces the
+    output once every row is written. An interrupted run leaves any earlier
+    output untouched.
+    """
+
+    def __init__(self, path: Union[str, Path], index: Iterable[Hashable], fieldnames: List[str]):
+        """Open the partial output file and write the header.
+
+        Args:
+            path: Output CSV path
+            index: Row keys in the order they should appear in the file
+            fieldnames: Column names, in order
+        """
+        self.path = Path(path)
+        self.partial_path = self.path.with_name(self.path.name + ".partial")
+        self._file = open(self.partial_path, 'w', newline='', encoding='utf-8')
+        self._writer = csv.DictWriter(self._file, fieldnames=fieldnames, extrasaction='ignore')
+        self._writer.writeheader()
+        self._file.flush()
+        self._order = list(index)
+        self._position = 0
+        self._pending: Dict[Hashable, Dict[str, Any]] = {}
+
+    @property
+    def complete(self) -> bool:
+        """Whether every expected row has been written."""
+        return self._position == len(self._order)
+
+    def add(self, index: Hashable, row: Dict[str, Any]) -> None:
+        """Queue a finished row and write any rows that are now in order.
+
+        Args:
+            index: Key of the row, as passed in ``index`` at construction
+            row: Column values for the row
+        """
+        self._pending[index] = row
+
+        written = False
+        while not self.complete and self._order[self._position] in self._pending:
+            row = self._pending.pop(self._order[self._position])
+            self._writer.writerow({key: _csv_value(value) for key, value in row.items()})
+            self._position += 1
+            written = True
+
+        if written:
+            self._file.flush()
+
+    def close(self) -> None:
+        """Close the file, moving it into place if every row was written."""
+        if self._file.closed:
+            return
+        self._file.close()
+        if self.complete:
+            os.replace(self.partial_path, self.path)
+
+def _csv_value(value: Any) -> Any:
+    """Render missing values as empty cells, as DataFrame.to_csv does."""
+    if pd.api.types.is_scalar(value) and pd.isna(value):
+        return None
+    return value
@@ -0,0 +1,22 @@
+"""DataFrame helpers for writing results back into input data."""
+
+from typing import Any, Dict, Hashable
+
+import pandas as pd
+
+def assign_columns(df: pd.DataFrame, rows: Dict[Hashable, Dict[str, Any]]) -> None:
+    """Write per-row values into a DataFrame one column at a time.
+    
+    Args:
+        df: DataFrame to update in place
+        rows: Mapping of row index to a dictionary of column values
+    """
+    if not rows:
+        return
+    
+    frame = pd.DataFrame.from_dict(rows, orient="index")
+    for column in frame.columns:
+        values = frame[column].dropna()
+        if column in df.columns:
+            values = values.combine_first(df[column])
+        df[column] = values
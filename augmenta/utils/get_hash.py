@@ -1,7 +1,7 @@
 """Utility functions and classes for the Augmenta package."""
 
-import json
 import hashlib
+import orjson
 from pathlib import Path
 from typing import Union
 
@@ -11,20 +11,26 @@ import logfire
 logging.basicConfig(handlers=[logfire.LogfireLoggingHandler()])
 logger = logging.getLogger(__name__)
 
-def get_hash(data: Union[dict, Path, str], chunk_size: int = 8192) -> str:
+# The hash is only used as an identifier, so a fast non-SHA2 digest is enough
+DIGEST_SIZE = 16
+
+def get_hash(data: Union[dict, Path, str], chunk_size: int = 1 << 20) -> str:
     """Generate a deterministic hash of data or file contents."""
-    hasher = hashlib.sha256()
+    hasher = hashlib.blake2b(digest_size=DIGEST_SIZE)
     
     if isinstance(data, dict):
-        hasher.update(json.dumps(data, sort_keys=True).encode('utf-8'))
+        hasher.update(orjson.dumps(data, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS))
     elif isinstance(data, (str, Path)):
         filepath = Path(data)
         if not filepath.exists():
             raise FileNotFoundError(f"File not found: {filepath}")
             
-        with open(filepath, 'rb') as f:
-            while chunk := f.read(chunk_size):
-                hasher.update(chunk)
+        # Read into one reused buffer so large files don't allocate a bytes object per chunk
+        buffer = bytearray(chunk_size)
+        view = memoryview(buffer)
+        with open(filepath, 'rb', buffering=0) as f:
+            while size := f.readinto(buffer):
+                hasher.update(view[:size])
     else:
         raise TypeError("Data must be a dictionary, Path, or string filepath")
         
@@ -0,0 +1,53 @@
+"""Shared HTTP client with connection pooling."""
+
+import asyncio
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+from typing import Optional
+
+import httpx
+
+# HTTP/2 multiplexes requests to the same host over one connection, but needs the optional h2 package
+try:
+    import h2  # noqa: F401
+    HTTP2 = True
+except ImportError:
+    HTTP2 = False
+
+# Connection pool limits shared by all outbound requests
+LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=40)
+
+_client: Optional[httpx.AsyncClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get the HTTP client shared by all requests on the running event loop.
+
+    Reusing one client keeps connections alive between requests, so repeat
+    requests to the same host skip DNS, TCP and TLS setup. With the http2
+    extra installed, concurrent requests to one host also share a connection
+    and responses can be brotli-compressed.
+
+    Returns:
+        Pooled httpx.AsyncClient bound to the running event loop
+    """
+    global _client, _client_loop
+
+    loop = asyncio.get_running_loop()
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        # Cookies are refused, so one row's requests never carry another row's session or paywall meter
+        _client = httpx.AsyncClient(
+            limits=LIMITS,
+            http2=HTTP2,
+            cookies=CookieJar(policy=DefaultCookiePolicy(allowed_domains=[]))
+        )
+        _client_loop = loop
+    return _client
+
+async def close_http_client() -> None:
+    """Close the shared HTTP client if it belongs to the running event loop."""
+    global _client, _client_loop
+
+    if _client is not None and _client_loop is asyncio.get_running_loop():
+        await _client.aclose()
+    _client = None
+    _client_loop = None
@@ -1,6 +1,11 @@
-from typing import List, Tuple, Optional, Any, Union, Dict
+from typing import List, Tuple, Optional, Any, Union, Dict, Set
+import re
 import yaml
 from pydantic_ai import format_as_xml
+from augmenta.config.read_config import load_yaml
+
+# Matches {{column}} placeholders in prompt templates
+PLACEHOLDER_PATTERN = re.compile(r"\{\{([^{}]+)\}\}")
 
 def format_xml(obj: Any, *, root_tag: str = "data", item_tag: str = "item", prefix: str = "") -> str:
     """Format data as XML using pydantic_ai's format_as_xml.
@@ -53,7 +58,7 @@ def format_xml(obj: Any, *, root_tag: str = "data", item_tag: str = "item", pref
     if isinstance(obj, str):
         # Handle YAML strings
         try:
-            obj = yaml.safe_load(obj)
+            obj = load_yaml(obj)
         except yaml.YAMLError as e:
             raise ValueError(f"Invalid YAML format: {e}")
     
@@ -85,7 +90,7 @@ def format_examples(examples_yaml: Union[str, list]) -> str:
     if isinstance(examples_yaml, list):
         data = {"examples": examples_yaml}
     else:
-        data = yaml.safe_load(examples_yaml)
+        data = load_yaml(examples_yaml)
     
     if not data or "examples" not in data:
         return ""
@@ -97,6 +102,10 @@ def format_examples(examples_yaml: Union[str, list]) -> str:
     
     return format_xml(data, prefix="## Examples")
 
+def get_template_variables(prompt_template: str) -> Set[str]:
+    """Get the names of all {{placeholder}} variables used in a prompt template."""
+    return set(PLACEHOLDER_PATTERN.findall(prompt_template))
+
 def substitute_template_variables(prompt_template: str, row_data: Dict[str, Any]) -> str:
     """Substitute variables in a prompt template with values from row data.
     
@@ -107,17 +116,25 @@ def substitute_template_variables(prompt_template: str, row_data: Dict[str, Any]
     Returns:
         Formatted prompt string with variables substituted
     """
-    formatted = prompt_template
-    for column, value in row_data.items():
-        formatted = formatted.replace(f"{{{{{column}}}}}", str(value))
-    return formatted
+    values = {str(column): value for column, value in row_data.items()}
+    
+    def replace(match: re.Match) -> str:
+        column = match.group(1)
+        return str(values[column]) if column in values else match.group(0)
+    
+    return PLACEHOLDER_PATTERN.sub(replace, prompt_template)
 
-def build_complete_prompt(config: Dict[str, Any], row: Dict[str, Any]) -> str:
+def build_complete_prompt(
+    config: Dict[str, Any],
+    row: Dict[str, Any],
+    examples_text: Optional[str] = None
+) -> str:
     """Build a complete prompt by combining templated content with examples.
     
     Args:
         config: Configuration dictionary containing prompt template and examples
         row: Row data for variable substitution
+        examples_text: Pre-formatted examples, to avoid re-formatting them for every row
         
     Returns:
         Complete formatted prompt with variables substituted and examples appended
@@ -126,8 +143,8 @@ def build_complete_prompt(config: Dict[str, Any], row: Dict[str, Any]) -> str:
     prompt_user = substitute_template_variables(config["prompt"]["user"], row)
         
     # Format examples if present
-    if examples_yaml := config.get("examples"):
-        if examples_text := format_examples(examples_yaml):
-            prompt_user = f'{prompt_user}\n\n{examples_text}'
-            
-    return prompt_user
\ No newline at end of file
+    if examples_text is None:
+        examples_yaml = config.get("examples")
+        examples_text = format_examples(examples_yaml) if examples_yaml else ""
+    
+    return "\n\n".join((prompt_user, examples_text)) if examples_text else prompt_user
@@ -0,0 +1,122 @@
+"""Tests for the cache manager."""
+
+import json
+import threading
+import pytest
+from augmenta.cache.manager import CacheManager, _STOP
+
+
+@pytest.fixture
+def cache_manager(tmp_path):
+    """Provide a fresh cache manager backed by a temporary directory."""
+    CacheManager._instance = None
+    manager = CacheManager(cache_dir=tmp_path)
+    yield manager
+    manager.cleanup()
+    CacheManager._instance = None
+
+
+def test_concurrent_construction_returns_single_instance(cache_manager):
+    """Test that concurrent construction never builds a second manager."""
+    instances = []
+    threads = [
+        threading.Thread(target=lambda: instances.append(CacheManager()))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert all(instance is cache_manager for instance in instances)
+    writers = [t for t in threading.enumerate() if t.name == "CacheWriterThread"]
+    assert len(writers) == 1
+
+
+def test_cleanup_flushes_pending_writes(cache_manager):
+    """Test that queued results are written before cleanup returns."""
+    process_id = cache_manager.start_process("config-hash", 3)
+    for index in range(3):
+        cache_manager.cache_result(process_id, index, str(index), json.dumps({"value": index}))
+
+    cache_manager.cleanup()
+    cache_manager.cleanup()
+
+    assert cache_manager.get_cached_results(process_id) == {
+        0: {"value": 0},
+        1: {"value": 1},
+        2: {"value": 2},
+    }
+    assert cache_manager.get_process_status(process_id).processed_rows == 3
+
+
+def test_llm_response_round_trip(cache_manager):
+    """Test that cached LLM responses can be read back by prompt hash."""
+    assert cache_manager.get_llm_response("prompt-hash") is None
+
+    cache_manager.cache_llm_response("prompt-hash", "openai:gpt-4o-mini", json.dumps({"label": "NGO"}))
+    cache_manager.cleanup()
+
+    assert cache_manager.get_llm_response("prompt-hash") == {"label": "NGO"}
+
+
+def test_coalesce_increments_merges_per_process():
+    """Test that processed-row increments collapse to one update per process."""
+    merged = CacheManager._coalesce_increments([
+        (1, "2024-01-01T00:00:01", "a"),
+        (1, "2024-01-01T00:00:03", "b"),
+        (1, "2024-01-01T00:00:02", "a"),
+    ])
+
+    assert merged == [(2, "2024-01-01T00:00:02", "a"), (1, "2024-01-01T00:00:03", "b")]
+
+
+def test_cached_results_read_uncompressed_rows(cache_manager):
+    """Test that results stored as plain JSON text before compression still load."""
+    process_id = cache_manager.start_process("config-hash", 2)
+    cache_manager.cache_result(process_id, 0, "0", json.dumps({"value": 0}))
+    cache_manager.cleanup()
+
+    with cache_manager.db.get_connection() as conn:
+        conn.execute(
+            "INSERT INTO results_cache (process_id, row_index, query, result, created_at) VALUES (?, ?, ?, ?, ?)",
+            (process_id, 1, "1", json.dumps({"value": 1}), "2024-01-01T00:00:00"),
+        )
+
+    assert cache_manager.get_cached_results(process_id) == {0: {"value": 0}, 1: {"value": 1}}
+
+
+def test_flush_commits_queued_writes(cache_manager):
+    """Test that flush waits for queued writes while the writer keeps running."""
+    process_id = cache_manager.start_process("config-hash", 1)
+    cache_manager.cache_result(process_id, 0, "0", json.dumps({"value": 0}))
+
+    cache_manager.flush()
+
+    assert cache_manager.get_cached_results(process_id) == {0: {"value": 0}}
+    assert cache_manager.writer_thread.is_alive()
+
+
+def test_flush_writes_held_progress(cache_manager):
+    """Test that flush commits processed-row updates held back by the heartbeat throttle."""
+    process_id = cache_manager.start_process("config-hash", 2)
+    for index in range(2):
+        cache_manager.cache_result(process_id, index, str(index), json.dumps({"value": index}))
+        cache_manager.flush()
+
+    assert cache_manager.get_process_status(process_id).processed_rows == 2
+
+
+def test_cleanup_returns_when_writer_has_died(tmp_path, monkeypatch):
+    """Test that cleanup doesn't wait on a full queue nobody is draining."""
+    monkeypatch.setattr(CacheManager, "MAX_QUEUED_WRITES", 1)
+    CacheManager._instance = None
+    manager = CacheManager(cache_dir=tmp_path)
+    manager.write_queue.put(_STOP)
+    manager.writer_thread.join()
+
+    manager.cache_result("process", 0, "0", json.dumps({"value": 0}))
+    manager.cleanup()
+
+    assert manager.write_queue.full()
+    CacheManager._instance = None
@@ -1,7 +1,8 @@
 """Tests for core augmenta functionality."""
 
 import pytest
-from augmenta.augmenta import ProcessingResult
+import pandas as pd
+from augmenta.augmenta import ProcessingResult, update_dataframe_with_results, group_identical_rows, build_output_row
 
 
 def test_processing_result_creation():
@@ -20,4 +21,39 @@ def test_processing_result_creation():
     )
     assert result_with_error.index == 2
     assert result_with_error.data is None
-    assert result_with_error.error == "Test error message"
\ No newline at end of file
+    assert result_with_error.error == "Test error message"
+
+
+def test_update_dataframe_with_results():
+    """Test that results and errors are written back to the right rows."""
+    df = pd.DataFrame({"name": ["a", "b", "c"], "label": [None, None, "old"]})
+    results = [
+        ProcessingResult(index=0, data={"label": "yes", "score": 1}),
+        ProcessingResult(index=1, data=None, error="failed"),
+    ]
+
+    assert update_dataframe_with_results(df, results) == (1, 1)
+    assert df.at[0, "label"] == "yes"
+    assert df.at[0, "score"] == 1
+    assert df.at[1, "_error"] == "failed"
+    assert df.at[2, "label"] == "old"
+    assert pd.isna(df.at[2, "score"])
+
+
+def test_group_identical_rows():
+    """Test that rows with the same prompt inputs are processed together."""
+    rows = [
+        {"index": 0, "data": {"name": "BBC"}},
+        {"index": 1, "data": {"name": "ITV"}},
+        {"index": 2, "data": {"name": "BBC"}},
+    ]
+    groups = group_identical_rows(rows)
+    assert [[row["index"] for row in group] for group in groups] == [[0, 2], [1]]
+
+
+def test_build_output_row_uses_raw_results():
+    """Test that output rows take result values as returned, not as upcast in the DataFrame."""
+    df = pd.DataFrame({"name": ["a", "b"], "score": [1.0, None]})
+
+    assert build_output_row(df, 0, ["name"], {"score": 1}) == {"name": "a", "score": 1}
+    assert build_output_row(df, 1, ["name"], None) == {"name": "b"}
@@ -1,6 +1,20 @@
 import asyncio
+import concurrent.futures
+import importlib
+from concurrent.futures.process import BrokenProcessPool
+import httpx
 import pytest
-from augmenta.tools.visit_webpages import visit_webpages
+from augmenta.tools.visit_webpages import HTTPProvider, TrafilaturaProvider, visit_webpages, _behind_login_wall, _remember_login_wall
+
+# augmenta.tools re-exports the visit_webpages function under the module's name
+visit_webpages_module = importlib.import_module("augmenta.tools.visit_webpages")
+
+@pytest.fixture
+def login_walls(monkeypatch):
+    """Give each test its own, empty set of login-walled hosts."""
+    walls = {}
+    monkeypatch.setattr(visit_webpages_module, "_login_walls", walls)
+    return walls
 
 async def main():
     # Test URLs - using some stable websites as examples
@@ -18,5 +32,111 @@ async def main():
         print(result['content'][:500] + "..." if len(result['content']) > 500 else result['content'])
         print("-" * 40)
 
+def test_unsupported_urls_are_skipped():
+    """Test that non-http URLs come back empty, in order, without being fetched."""
+    urls = ['ftp://example.com/file', 'not a url', '', 'not a url', 'https://example.com/' + 'a' * 2048]
+    results = asyncio.run(visit_webpages(urls))
+    assert results == [{'url': url, 'content': ''} for url in urls]
+
+def test_retry_delay_backs_off_and_honours_retry_after():
+    """Test that retries back off exponentially within bounds and respect Retry-After."""
+    provider = HTTPProvider()
+    assert 0.5 <= provider._retry_delay(1) <= 1.0
+    assert 1.0 <= provider._retry_delay(2) <= 2.0
+    assert provider._retry_delay(1, "3") == 3.0
+    assert provider._retry_delay(1, "600") == provider.MAX_RETRY_DELAY
+
+def test_login_wall_skips_the_whole_host(login_walls):
+    """Test that a login redirect marks every page on that host, and only that host."""
+    _remember_login_wall('https://Walled.example.com/article/1')
+    assert _behind_login_wall('https://walled.example.com/article/2')
+    assert not _behind_login_wall('https://open.example.com/article/1')
+
+def test_only_transient_errors_are_retried():
+    """Test that dropped connections are retried but unsupported redirects are not."""
+    provider = HTTPProvider()
+    assert provider._is_transient(httpx.ConnectError("refused"))
+    assert not provider._is_transient(httpx.UnsupportedProtocol("mailto:"))
+    assert not provider._is_transient(httpx.LocalProtocolError("bad header"))
+
+def test_redirect_to_author_page_is_not_a_login_wall(login_walls, monkeypatch):
+    """Test that an http to https redirect onto an /authors/ path is fetched, not treated as a login wall."""
+    def handler(request):
+        if request.url.scheme == "http":
+            return httpx.Response(301, headers={"location": "https://news.example.com/authors/jane-doe"})
+        return httpx.Response(200, headers={"content-type": "text/html"}, text="<html><body>Jane</body></html>")
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(visit_webpages_module, "get_http_client", lambda: client)
+
+    content = asyncio.run(HTTPProvider().get_content("http://news.example.com/authors/jane-doe"))
+    assert content == "<html><body>Jane</body></html>"
+    assert login_walls == {}
+
+def test_large_pages_fall_back_to_threads_without_processes(monkeypatch):
+    """Test that large pages are still extracted when worker processes can't be started."""
+    def unavailable(*args, **kwargs):
+        raise OSError("no processes here")
+
+    monkeypatch.setattr(visit_webpages_module, "ProcessPoolExecutor", unavailable)
+    monkeypatch.setattr(visit_webpages_module, "_extraction_pool", None)
+    monkeypatch.setattr(visit_webpages_module, "_extraction_pool_unavailable", False)
+
+    paragraphs = "".join(f"<p>Paragraph {i} has enough words in it to be kept as content.</p>" for i in range(2000))
+    html = f"<html><body><article><h1>Heading</h1>{paragraphs}</article></body></html>"
+    assert len(html) >= visit_webpages_module.THREAD_EXTRACTION_CHARS
+
+    content = asyncio.run(TrafilaturaProvider().get_content(html))
+    assert content and "Paragraph 1999" in content
+    assert visit_webpages_module._extraction_pool_unavailable
+
+def test_login_wall_is_recorded_for_the_host_that_redirected(login_walls, monkeypatch):
+    """Test that a shortener handing off to another site's login doesn't wall the shortener."""
+    def handler(request):
+        if request.url.path in ("/login", "/auth"):
+            return httpx.Response(200, headers={"content-type": "text/html"}, text="<form>Sign in</form>")
+        if request.url.host == "short.example":
+            return httpx.Response(302, headers={"location": f"https://site.example{request.url.path}"})
+        if request.url.path.startswith("/article"):
+            return httpx.Response(302, headers={"location": "https://site.example/login"})
+        return httpx.Response(302, headers={"location": "https://sso.vendor.example/auth"})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(visit_webpages_module, "get_http_client", lambda: client)
+
+    assert asyncio.run(HTTPProvider().get_content("https://short.example/other")) is None
+    assert login_walls == {}
+
+    assert asyncio.run(HTTPProvider().get_content("https://short.example/article")) is None
+    assert list(login_walls) == ["site.example"]
+
+def test_large_pages_are_retried_on_threads_when_the_pool_breaks(monkeypatch):
+    """Test that a broken pool loses no pages and is given up on after repeated breaks."""
+    class BrokenPool:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def submit(self, *args):
+            future = concurrent.futures.Future()
+            future.set_exception(BrokenProcessPool("worker died"))
+            return future
+
+        def shutdown(self, wait=True):
+            pass
+
+    monkeypatch.setattr(visit_webpages_module, "ProcessPoolExecutor", BrokenPool)
+    monkeypatch.setattr(visit_webpages_module, "_extraction_pool", None)
+    monkeypatch.setattr(visit_webpages_module, "_extraction_pool_breaks", 0)
+    monkeypatch.setattr(visit_webpages_module, "_extraction_pool_unavailable", False)
+
+    paragraphs = "".join(f"<p>Paragraph {i} has enough words in it to be kept as content.</p>" for i in range(2000))
+    html = f"<html><body><article><h1>Heading</h1>{paragraphs}</article></body></html>"
+
+    for _ in range(visit_webpages_module.MAX_POOL_BREAKS):
+        assert not visit_webpages_module._extraction_pool_unavailable
+        content = asyncio.run(TrafilaturaProvider().get_content(html))
+        assert content and "Paragraph 1999" in content
+    assert visit_webpages_module._extraction_pool_unavailable
+
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
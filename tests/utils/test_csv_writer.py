@@ -0,0 +1,35 @@
+"""Tests for the streaming CSV writer."""
+
+from augmenta.utils.csv_writer import OrderedCSVWriter
+
+
+def test_rows_are_written_in_input_order(tmp_path):
+    """Test that out-of-order rows are held back until their turn."""
+    path = tmp_path / "out.csv"
+    writer = OrderedCSVWriter(path, [0, 1, 2], ["name", "label"])
+
+    writer.add(1, {"name": "b", "label": "y"})
+    assert writer.partial_path.read_text() == "name,label\n"
+
+    writer.add(0, {"name": "a", "label": float("nan")})
+    assert writer.partial_path.read_text() == "name,label\na,\nb,y\n"
+    assert not writer.complete
+
+    writer.add(2, {"name": "c", "label": "z"})
+    writer.close()
+    assert writer.complete
+    assert path.read_text() == "name,label\na,\nb,y\nc,z\n"
+    assert not writer.partial_path.exists()
+
+
+def test_interrupted_run_keeps_previous_output(tmp_path):
+    """Test that an incomplete run leaves the existing output file alone."""
+    path = tmp_path / "out.csv"
+    path.write_text("name,label\nold,row\n")
+    writer = OrderedCSVWriter(path, [0, 1], ["name", "label"])
+
+    writer.add(0, {"name": "a", "label": "x"})
+    writer.close()
+
+    assert path.read_text() == "name,label\nold,row\n"
+    assert writer.partial_path.read_text() == "name,label\na,x\n"
@@ -0,0 +1,23 @@
+"""Tests for the hashing helpers."""
+
+import pytest
+from augmenta.utils.get_hash import get_hash
+
+
+def test_dict_hash_ignores_key_order():
+    """Test that dictionaries with the same content hash identically."""
+    assert get_hash({"a": 1, "b": [1, 2]}) == get_hash({"b": [1, 2], "a": 1})
+    assert get_hash({"a": 1}) != get_hash({"a": 2})
+
+
+def test_file_hash(tmp_path):
+    """Test that file hashes depend only on file contents."""
+    first = tmp_path / "first.csv"
+    second = tmp_path / "second.csv"
+    first.write_text("a,b\n1,2\n")
+    second.write_text("a,b\n1,2\n")
+    assert get_hash(first) == get_hash(str(second))
+    assert get_hash(first, chunk_size=3) == get_hash(first)
+
+    with pytest.raises(FileNotFoundError):
+        get_hash(tmp_path / "missing.csv")
@@ -0,0 +1,20 @@
+"""Tests for the shared HTTP client."""
+
+import asyncio
+
+import httpx
+
+from augmenta.utils.http_client import close_http_client, get_http_client
+
+
+def test_shared_client_keeps_no_cookies():
+    """Test that cookies set by one response are never sent with later requests."""
+    async def set_cookie():
+        client = get_http_client()
+        request = httpx.Request("GET", "https://example.com/a")
+        client.cookies.extract_cookies(httpx.Response(200, headers={"set-cookie": "metered=1; Path=/"}, request=request))
+        cookies = len(client.cookies)
+        await close_http_client()
+        return cookies
+
+    assert asyncio.run(set_cookie()) == 0
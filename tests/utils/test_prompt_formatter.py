@@ -0,0 +1,21 @@
+"""Tests for prompt formatting."""
+
+from augmenta.utils.prompt_formatter import substitute_template_variables, build_complete_prompt
+
+
+def test_substitute_template_variables():
+    """Test that placeholders are filled in a single pass."""
+    template = "Research {{name}} ({{kind}}) but not {{missing}}"
+    row = {"name": "{{kind}}", "kind": "company"}
+    assert substitute_template_variables(template, row) == (
+        "Research {{kind}} (company) but not {{missing}}"
+    )
+
+
+def test_build_complete_prompt_uses_preformatted_examples():
+    """Test that pre-formatted examples are appended without re-formatting."""
+    config = {"prompt": {"user": "Research {{name}}"}, "examples": "not: [valid"}
+    assert build_complete_prompt(config, {"name": "BBC"}, "## Examples") == (
+        "Research BBC\n\n## Examples"
+    )
+    assert build_complete_prompt({"prompt": {"user": "{{name}}"}}, {"name": "BBC"}) == "BBC"